@@ -4,6 +4,10 @@ import cv2
 import re
 import numpy as np
 import os
+import time
+from contextlib import contextmanager
+
+from easyocr.utils import reformat_input
 
 
 class AnalyzeSpectrum:
@@ -15,9 +19,67 @@ class AnalyzeSpectrum:
     REGION_DATE = (0, 18, 440, 620)
     REGION_UPPER = (78, 100, 0, 250)
 
-    def __init__(self):
+    def __init__(self, profile=False):
         self.reader = easyocr.Reader(['en'])
         self.current_date = None
+        self.profile = profile
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.stats = {
+            "images": 0,
+            "skipped": 0,
+            "region_hits": 0,
+            "fallback_offsize": 0,
+            "fallback_region_miss": 0,
+            "decode_s": 0.0,
+            "crop_s": 0.0,
+            "detect_s": 0.0,
+            "recognize_s": 0.0,
+            "fallback_s": 0.0,
+        }
+
+    @contextmanager
+    def _timed(self, key):
+        if not self.profile:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stats[key] += time.perf_counter() - start
+
+    def _readtext(self, image):
+        if not self.profile:
+            return self.reader.readtext(image)
+        # Same steps as Reader.readtext, split so detection and recognition are timed separately
+        img, img_cv_grey = reformat_input(image)
+        with self._timed("detect_s"):
+            horizontal_list, free_list = self.reader.detect(img, reformat=False)
+        with self._timed("recognize_s"):
+            return self.reader.recognize(img_cv_grey, horizontal_list[0], free_list[0], reformat=False)
+
+    def fallback_rate(self):
+        analyzed = self.stats["images"] - self.stats["skipped"]
+        if not analyzed:
+            return 0.0
+        fallbacks = self.stats["fallback_offsize"] + self.stats["fallback_region_miss"]
+        return fallbacks / analyzed
+
+    def profile_report(self):
+        s = self.stats
+        lines = [
+            f"Images: {s['images']} ({s['skipped']} skipped, {s['region_hits']} region hits)",
+            f"Full-image fallback: {s['fallback_offsize']} off-size + {s['fallback_region_miss']} region miss"
+            f" ({self.fallback_rate():.1%})",
+        ]
+        if self.profile:
+            lines.append(
+                f"Time: decode {s['decode_s']:.2f}s | crop {s['crop_s']:.3f}s | detect {s['detect_s']:.2f}s"
+                f" | recognize {s['recognize_s']:.2f}s | fallback {s['fallback_s']:.2f}s (incl. OCR)"
+            )
+        return "\n".join(lines)
 
     def _is_standard_screenshot(self, image):
         h, w = image.shape[:2]
@@ -28,8 +90,9 @@ class AnalyzeSpectrum:
 
     def _ocr_region(self, image, region):
         y1, y2, x1, x2 = region
-        crop = image[y1:y2, x1:x2]
-        results = self.reader.readtext(crop)
+        with self._timed("crop_s"):
+            crop = image[y1:y2, x1:x2]
+        results = self._readtext(crop)
         return " ".join(text.strip() for _, text, _ in results)
 
     def _extract_date_from_region(self, image):
@@ -60,7 +123,7 @@ class AnalyzeSpectrum:
         return None
 
     def _analyze_full_image(self, image):
-        results = self.reader.readtext(image)
+        results = self._readtext(image)
         if not results:
             return "Not pattern detected"
 
@@ -99,20 +162,29 @@ class AnalyzeSpectrum:
 
     def analyze_spectrum(self, image_path):
         try:
-            image = cv2.imread(str(image_path))
+            self.stats["images"] += 1
+            with self._timed("decode_s"):
+                image = cv2.imread(str(image_path))
             if image is None:
+                self.stats["skipped"] += 1
                 return "Not pattern detected", [self.current_date] if self.current_date else []
 
             if not self._is_dark_image(image):
+                self.stats["skipped"] += 1
                 return "Not pattern detected", [self.current_date] if self.current_date else []
 
             if self._is_standard_screenshot(image):
                 self._extract_date_from_region(image)
                 pattern = self._detect_pattern_from_regions(image)
                 if pattern:
+                    self.stats["region_hits"] += 1
                     return pattern, [self.current_date] if self.current_date else []
+                self.stats["fallback_region_miss"] += 1
+            else:
+                self.stats["fallback_offsize"] += 1
 
-            pattern = self._analyze_full_image(image)
+            with self._timed("fallback_s"):
+                pattern = self._analyze_full_image(image)
             return pattern, [self.current_date] if self.current_date else []
 
         except Exception as e:
@@ -128,42 +200,128 @@ class AnalyzeSpectrum:
         return remarks.get(pattern_type)
 
 
-if __name__ == "__main__":
+def analyze_folders(analyzer, picture_dir):
+    from pathlib import Path
+
+    total_images = 0
+    processed_images = 0
+
+    for root, dirs, files in os.walk(picture_dir):
+        for folder in sorted(dirs):
+            folder_path = os.path.join(root, folder)
+            print(f"\nProcessing folder: {folder}")
+            print("=" * 50)
+
+            image_files = []
+            for ext in ['*.png', '*.jpg', '*.jpeg']:
+                image_files.extend(Path(folder_path).glob(ext))
+
+            if not image_files:
+                print(f"No images found in {folder}")
+                continue
+
+            for image_path in sorted(image_files, key=lambda p: p.name):
+                total_images += 1
+                try:
+                    pattern_type, date_text = analyzer.analyze_spectrum(str(image_path))
+                    remark = analyzer.get_remark_text(pattern_type)
+                    print(f"  {image_path.name}: {pattern_type} | {date_text}")
+                    processed_images += 1
+                except Exception as e:
+                    print(f"  {image_path.name}: ERROR - {e}")
+
+    print(f"\nSummary: {processed_images}/{total_images} processed")
+
+
+def peak_rss_mb():
+    import resource
+    import sys
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes on Linux
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def benchmark(analyzer, corpus_dir):
+    import json
     from pathlib import Path
 
+    corpus_dir = Path(corpus_dir)
+    manifest = json.loads((corpus_dir / "manifest.json").read_text())
+    analyzer.reset_stats()
+
+    correct = 0
+    start = time.perf_counter()
+    for entry in manifest:
+        analyzer.current_date = None
+        pattern_type, date_text = analyzer.analyze_spectrum(str(corpus_dir / entry["file"]))
+        if pattern_type == entry["pattern"]:
+            correct += 1
+    elapsed = time.perf_counter() - start
+
+    print(f"\nBenchmark: {corpus_dir} ({len(manifest)} images)")
+    print("=" * 50)
+    print(f"Throughput: {len(manifest) / elapsed:.2f} images/sec ({elapsed:.2f}s)")
+    print(f"Accuracy: {correct}/{len(manifest)} ({correct / max(len(manifest), 1):.1%})")
+    print(analyzer.profile_report())
+    print(f"Peak RSS: {peak_rss_mb():.0f} MB")
+
+
+def run_profiled(func, *args):
+    import cProfile
+    import pstats
+    import tracemalloc
+
+    profiler = cProfile.Profile()
+    tracemalloc.start()
+    profiler.enable()
+    try:
+        return func(*args)
+    finally:
+        profiler.disable()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print("\ncProfile (top 25 by cumulative time)")
+        print("=" * 50)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        print(f"tracemalloc peak (Python allocations): {peak / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Spectrum image analysis")
+    parser.add_argument("--dir", default=os.path.join(current_dir, "picture"),
+                        help="folder with station subfolders (default: picture/)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time OCR stages and run under cProfile + tracemalloc")
+    parser.add_argument("--generate-corpus", metavar="DIR",
+                        help="write a synthetic labelled benchmark corpus to DIR and exit")
+    parser.add_argument("--count", type=int, default=60, help="corpus size (default: 60)")
+    parser.add_argument("--seed", type=int, default=0, help="corpus random seed (default: 0)")
+    parser.add_argument("--benchmark", metavar="DIR", help="benchmark against a generated corpus")
+    args = parser.parse_args()
+
     try:
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        picture_dir = os.path.join(current_dir, "picture")
-
-        analyzer = AnalyzeSpectrum()
-        total_images = 0
-        processed_images = 0
-
-        for root, dirs, files in os.walk(picture_dir):
-            for folder in sorted(dirs):
-                folder_path = os.path.join(root, folder)
-                print(f"\nProcessing folder: {folder}")
-                print("=" * 50)
-
-                image_files = []
-                for ext in ['*.png', '*.jpg', '*.jpeg']:
-                    image_files.extend(Path(folder_path).glob(ext))
-
-                if not image_files:
-                    print(f"No images found in {folder}")
-                    continue
-
-                for image_path in sorted(image_files, key=lambda p: p.name):
-                    total_images += 1
-                    try:
-                        pattern_type, date_text = analyzer.analyze_spectrum(str(image_path))
-                        remark = analyzer.get_remark_text(pattern_type)
-                        print(f"  {image_path.name}: {pattern_type} | {date_text}")
-                        processed_images += 1
-                    except Exception as e:
-                        print(f"  {image_path.name}: ERROR - {e}")
-
-        print(f"\nSummary: {processed_images}/{total_images} processed")
+        if args.generate_corpus:
+            from spectrum_corpus import generate_corpus
+
+            manifest = generate_corpus(args.generate_corpus, count=args.count, seed=args.seed)
+            print(f"Wrote {len(manifest)} images to {args.generate_corpus}")
+        else:
+            analyzer = AnalyzeSpectrum(profile=args.profile)
+            if args.benchmark:
+                task, task_args = benchmark, (analyzer, args.benchmark)
+            else:
+                task, task_args = analyze_folders, (analyzer, args.dir)
+
+            if args.profile:
+                run_profiled(task, *task_args)
+                if not args.benchmark:
+                    print(analyzer.profile_report())
+            else:
+                task(*task_args)
 
     except Exception as e:
         print(f"Error: {e}")
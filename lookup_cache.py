@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+Session cache for dropdown lookups (option text -> option value).
+Optionally persisted to a JSON file with a TTL so later runs skip option scans too.
+"""
+
+import json
+import time
+from pathlib import Path
+
+
+class LookupCache:
+
+    def __init__(self, path=None, ttl_hours=24, enabled=True):
+        self.path = Path(path) if path else None
+        self.ttl_seconds = ttl_hours * 3600
+        self.enabled = enabled
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    def _key(self, field_id, parent, search):
+        return f"{field_id}|{parent}|{search}"
+
+    def load(self):
+        if not (self.enabled and self.path and self.path.exists()):
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        self.entries = {
+            key: entry for key, entry in data.items()
+            if now - entry.get("saved_at", 0) < self.ttl_seconds
+        }
+
+    def save(self):
+        if not (self.enabled and self.path):
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    def get(self, field_id, parent, search):
+        if not self.enabled:
+            return None
+        entry = self.entries.get(self._key(field_id, parent, search))
+        if entry and time.time() - entry["saved_at"] < self.ttl_seconds:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def put(self, field_id, parent, search, value, text):
+        if not self.enabled:
+            return
+        self.entries[self._key(field_id, parent, search)] = {
+            "value": value,
+            "text": text,
+            "saved_at": time.time(),
+        }
+        self.save()
+
+    def invalidate(self, field_id, parent, search):
+        if self.entries.pop(self._key(field_id, parent, search), None) is not None:
+            self.save()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+"""
+Samples resident memory of the Python process and the Chrome browser it drives.
+UC mode starts Chrome detached, so the browser PID is tracked explicitly and only
+its process tree counts as Chrome (not chromedriver or Xvfb).
+"""
+
+import time
+
+import psutil
+
+MB = 1024 * 1024
+
+
+class ResourceMonitor:
+
+    def __init__(self):
+        self.process = psutil.Process()
+        self.samples = []
+
+    def _rss(self, proc):
+        try:
+            return proc.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return 0
+
+    def _browser_processes(self, browser_pid):
+        """Chrome's process tree; falls back to all children when the PID is unknown."""
+        root = None
+        if browser_pid:
+            try:
+                root = psutil.Process(browser_pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        if root is None:
+            # Without a browser PID this also counts chromedriver (and Xvfb)
+            try:
+                return self.process.children(recursive=True)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                return []
+        try:
+            return [root] + root.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            return [root]
+
+    def sample(self, label, browser_pid=None):
+        python_rss = self._rss(self.process)
+        chrome_rss = sum(self._rss(p) for p in self._browser_processes(browser_pid))
+        entry = {
+            "label": label,
+            "time": time.time(),
+            "python_mb": python_rss / MB,
+            "chrome_mb": chrome_rss / MB,
+            "total_mb": (python_rss + chrome_rss) / MB,
+        }
+        self.samples.append(entry)
+        return entry
+
+    def peak_mb(self):
+        return max((s["total_mb"] for s in self.samples), default=0.0)
+
+    def average_mb(self):
+        if not self.samples:
+            return 0.0
+        return sum(s["total_mb"] for s in self.samples) / len(self.samples)
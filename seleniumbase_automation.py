@@ -6,7 +6,10 @@ Uses WebDriver window.open() for new tabs (shares session cookies).
 Fills iframe forms in separate tabs to avoid Cloudflare iframe blocking.
 """
 
+import argparse
 import datetime
+import gc
+import json
 import os
 import random
 import shutil
@@ -18,14 +21,97 @@ from dotenv import load_dotenv
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
+from selenium.common.exceptions import WebDriverException
 from seleniumbase import SB
 
 from analyze_spectrum import AnalyzeSpectrum
+from lookup_cache import LookupCache
+from resource_monitor import ResourceMonitor
+from station_watcher import StationWatcher
+from upload_optimizer import UploadOptimizer
 
 load_dotenv()
 
 FORM_BASE_URL = "https://fmr.nbtc.go.th/Oper/ISO/11"
 
+RUN_PROFILES = {
+    "display": {"headless": False},
+    "headless": {"headless": True},
+    "xvfb": {"headless": False, "xvfb": True},
+}
+
+# Chrome DevTools URL patterns blocked when NBTC_BLOCK_RESOURCES=1.
+# Scripts and stylesheets are kept: the forms and Cloudflare need them.
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+]
+
+# Finds result rows in the mStnSch station search whose cells contain the exact
+# site code. arguments: code, ref of the row to click (or null), click flag.
+FIND_STATION_ROWS_JS = """
+var code = arguments[0].trim().toUpperCase();
+var wantRef = arguments[1];
+var click = arguments[2];
+var matches = [];
+var links = [];
+var rows = document.querySelectorAll("tr");
+for (var i = 0; i < rows.length; i++) {
+    // Layout tables wrap the results grid; only innermost rows are result rows
+    if (rows[i].querySelector("tr")) continue;
+    var link = rows[i].querySelector("a");
+    if (!link) continue;
+    var cells = rows[i].querySelectorAll("td");
+    for (var j = 0; j < cells.length; j++) {
+        var tokens = cells[j].textContent.trim().toUpperCase().split(/\\s+/);
+        if (tokens.indexOf(code) >= 0) {
+            matches.push({
+                text: rows[i].textContent.replace(/\\s+/g, " ").trim(),
+                ref: (link.getAttribute("onclick") || "") + (link.getAttribute("href") || "")
+            });
+            links.push(link);
+            break;
+        }
+    }
+}
+var clicked = false;
+if (click) {
+    for (var k = 0; k < matches.length; k++) {
+        if (matches[k].ref === wantRef || matches.length === 1) {
+            links[k].click();
+            clicked = true;
+            break;
+        }
+    }
+}
+return {matches: matches, clicked: clicked};
+"""
+
+# Marks the station search page before its postback. A full postback replaces
+# the window (marker gone); an UpdatePanel postback fires endRequest.
+MARK_SEARCH_PENDING_JS = """
+window.__nbtcSearchPending = true;
+window.__nbtcSearchDone = false;
+if (typeof Sys !== "undefined" && Sys.WebForms && Sys.WebForms.PageRequestManager) {
+    Sys.WebForms.PageRequestManager.getInstance().add_endRequest(function () {
+        window.__nbtcSearchDone = true;
+    });
+}
+"""
+
+SEARCH_DONE_JS = """
+if (!window.__nbtcSearchPending) return document.readyState === "complete";
+return window.__nbtcSearchDone === true;
+"""
+
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+# Failed after the postback fired: the item or record may already exist, so never retried
+SUBMITTED = "submitted"
+
 INSPECTOR_OPTIONS = [
     {"value": "491", "name": "นางสาว ปิยาพัชร เกิดไพบูลย์ (เจ้าหน้าที่ตรวจสอบและปฏิบัติการ)"},
     {"value": "529", "name": "นาย ธีราทร ภิรมย์ไกรภักดิ์ (ลูกจ้างประจำ)"},
@@ -45,6 +131,52 @@ class NBTCSeleniumBaseAgent:
         self.password = os.getenv("NBTC_PASSWORD")
         self.login_url = os.getenv("NBTC_LOGIN_URL")
         self.analyzer = AnalyzeSpectrum()
+        self.selected_inspectors = [None] * 4
+        self.default_power = os.getenv("NBTC_DEFAULT_POWER_W", "500")
+        self.default_gain = os.getenv("NBTC_DEFAULT_GAIN_DBI", "6")
+        self.default_ant_height = os.getenv("NBTC_DEFAULT_ANT_HEIGHT_M", "60")
+        self.default_cable = os.getenv("NBTC_DEFAULT_CABLE", "Heliax7/8")
+        self.sb = None
+        self._sb_context = None
+        self.home_url = None
+        self.search_url = None
+        self.add_form_url = None
+        self.station_search_url = None
+        self.station_refs = {}
+        self.monitor = ResourceMonitor()
+        self.last_sample = None
+        self.stations_since_recycle = 0
+        self.recycle_count = 0
+        self.recycle_after_stations = int(os.getenv("NBTC_RECYCLE_AFTER_STATIONS", "20"))
+        self.recycle_chrome_mb = float(os.getenv("NBTC_RECYCLE_CHROME_MB", "2000"))
+        self.lookups = LookupCache(
+            path=os.getenv("NBTC_LOOKUP_CACHE_FILE") or None,
+            ttl_hours=float(os.getenv("NBTC_LOOKUP_CACHE_TTL_HOURS", "24")),
+            enabled=os.getenv("NBTC_LOOKUP_CACHE", "1") != "0",
+        )
+        self.run_profile = os.getenv("NBTC_RUN_PROFILE", "display")
+        if self.run_profile not in RUN_PROFILES:
+            raise ValueError(f"Unknown NBTC_RUN_PROFILE: {self.run_profile} (use {', '.join(RUN_PROFILES)})")
+        self.block_resources = os.getenv("NBTC_BLOCK_RESOURCES", "0") == "1"
+        extra_patterns = [p.strip() for p in os.getenv("NBTC_BLOCK_PATTERNS", "").split(",") if p.strip()]
+        self.blocked_patterns = BLOCKED_URL_PATTERNS + extra_patterns
+        self.page_stats = {}
+        self.last_upload = None
+        self.station_uploads = []
+        self.failure = None
+        self.station_retries = 0
+        self.retry_attempts = int(os.getenv("NBTC_RETRY_ATTEMPTS", "2"))
+        self.retry_base_seconds = float(os.getenv("NBTC_RETRY_BASE_SECONDS", "5"))
+        self.retry_max_seconds = float(os.getenv("NBTC_RETRY_MAX_SECONDS", "60"))
+        self.station_preflight = os.getenv("NBTC_STATION_PREFLIGHT", "1") != "0"
+        self.search_timeout = int(os.getenv("NBTC_SEARCH_TIMEOUT_SECONDS", "20"))
+        self.uploads = UploadOptimizer(
+            cache_dir=os.getenv("NBTC_UPLOAD_CACHE_DIR", ".cache/uploads"),
+            max_side=int(os.getenv("NBTC_UPLOAD_MAX_SIDE", "2048")),
+            quality=int(os.getenv("NBTC_UPLOAD_QUALITY", "85")),
+            max_kb=int(os.getenv("NBTC_UPLOAD_MAX_KB", "500")),
+            enabled=os.getenv("NBTC_UPLOAD_OPTIMIZE", "1") != "0",
+        )
 
     def log(self, message, style="white"):
         timestamp = time.strftime("%H:%M:%S")
@@ -64,7 +196,9 @@ class NBTCSeleniumBaseAgent:
             choices=choices,
             validate=lambda result: len(result) >= 1 or "Pick at least 1 inspector",
         ).ask()
+        self.set_inspectors(selected_values)
 
+    def set_inspectors(self, selected_values):
         selected = []
         lines = []
         for val in selected_values:
@@ -74,10 +208,151 @@ class NBTCSeleniumBaseAgent:
         while len(selected) < 4:
             selected.append(None)
 
-        lines.append(f"\n  [dim]Defaults: 500W / 6dBi / 60m / Heliax7/8[/dim]")
+        lines.append(
+            f"\n  [dim]Defaults: {self.default_power}W / {self.default_gain}dBi"
+            f" / {self.default_ant_height}m / {self.default_cable}[/dim]"
+        )
         self.console.print(Panel("\n".join(lines), title="Configuration", border_style="cyan"))
         self.selected_inspectors = selected
 
+    def load_inspectors_from_env(self):
+        raw = os.getenv("NBTC_INSPECTORS", "")
+        known = [opt["value"] for opt in INSPECTOR_OPTIONS]
+        values = [v.strip() for v in raw.split(",") if v.strip()] or known
+        unknown = [v for v in values if v not in known]
+        if unknown:
+            raise ValueError(f"Unknown inspector IDs in NBTC_INSPECTORS: {', '.join(unknown)}")
+        if len(values) > 4:
+            raise ValueError("NBTC_INSPECTORS accepts at most 4 inspector IDs")
+        self.set_inspectors(values)
+
+    def open_browser(self):
+        if self.sb is None:
+            self.log(f"Starting browser (profile: {self.run_profile})...", "cyan")
+            self._sb_context = SB(uc=True, test=True, incognito=True, locale="th", **RUN_PROFILES[self.run_profile])
+            self.sb = self._sb_context.__enter__()
+            self.apply_resource_blocking(self.sb)
+            self.home_url = None
+            self.stations_since_recycle = 0
+        return self.sb
+
+    def close_browser(self):
+        if self._sb_context is not None:
+            try:
+                self._sb_context.__exit__(None, None, None)
+            except Exception as e:
+                self.log(f"Browser close error: {e}", "yellow")
+        self._sb_context = None
+        self.sb = None
+        self.home_url = None
+
+    def apply_resource_blocking(self, sb):
+        if not self.block_resources:
+            return
+        try:
+            sb.driver.execute_cdp_cmd("Network.enable", {})
+            sb.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.blocked_patterns})
+        except Exception as e:
+            self.log(f"Resource blocking unavailable: {e}", "yellow")
+
+    def measure_page(self, sb, step, timeout=10):
+        # Sub-form controls can appear before the load event; wait so load_ms is not 0
+        stats = None
+        for _ in range(timeout * 2):
+            try:
+                stats = sb.execute_script('''
+                    var nav = performance.getEntriesByType("navigation")[0];
+                    if (!nav || nav.loadEventEnd <= 0) return null;
+                    var res = performance.getEntriesByType("resource");
+                    var bytes = nav.transferSize;
+                    for (var i = 0; i < res.length; i++) bytes += res[i].transferSize || 0;
+                    return {
+                        bytes: bytes,
+                        load_ms: nav.loadEventEnd - nav.startTime,
+                        requests: res.length + 1
+                    };
+                ''')
+            except Exception:
+                return None
+            if stats:
+                break
+            sb.sleep(0.5)
+        if stats:
+            self.page_stats.setdefault(step, []).append(stats)
+        return stats
+
+    def browser_pid(self):
+        if self.sb is None:
+            return None
+        return getattr(self.sb.driver, "browser_pid", None)
+
+    def release_model_memory(self):
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+
+    def record_station_resources(self, fm_number):
+        self.stations_since_recycle += 1
+        sample = self.monitor.sample(fm_number, self.browser_pid())
+        self.last_sample = sample
+        self.log(f"Memory: python {sample['python_mb']:.0f} MB, chrome {sample['chrome_mb']:.0f} MB")
+
+        reason = None
+        if self.recycle_after_stations and self.stations_since_recycle >= self.recycle_after_stations:
+            reason = f"{self.stations_since_recycle} stations"
+        elif self.recycle_chrome_mb and sample["chrome_mb"] >= self.recycle_chrome_mb:
+            # Only Chrome's share: recycling the browser cannot shrink the Python/OCR process
+            reason = f"chrome {sample['chrome_mb']:.0f} MB >= {self.recycle_chrome_mb:.0f} MB"
+
+        if reason and self.sb is not None:
+            self.log(f"Recycling browser ({reason})", "yellow")
+            self.close_browser()
+            self.release_model_memory()
+            self.recycle_count += 1
+
+    def fail(self, kind, reason):
+        self.failure = (kind, reason)
+        return False
+
+    def fail_item(self, submitted, reason):
+        if submitted:
+            return self.fail(SUBMITTED, f"{reason} after submit")
+        return self.fail(TRANSIENT, reason)
+
+    def backoff_delay(self, attempt):
+        delay = min(self.retry_max_seconds, self.retry_base_seconds * (2 ** attempt))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def with_retry(self, label, func, *args):
+        """Call func until it succeeds, retrying transient failures with backoff."""
+        for attempt in range(self.retry_attempts + 1):
+            self.failure = None
+            if func(*args):
+                return True
+            kind, reason = self.failure or (TRANSIENT, "unknown error")
+            self.failure = (kind, reason)
+            if kind != TRANSIENT or attempt == self.retry_attempts:
+                return False
+            delay = self.backoff_delay(attempt)
+            self.station_retries += 1
+            self.log(f"{label}: {reason} - retry {attempt+1}/{self.retry_attempts} in {delay:.1f}s", "yellow")
+            time.sleep(delay)
+        return False
+
+    def ensure_session(self, sb):
+        if self.home_url:
+            try:
+                sb.open(self.home_url)
+                sb.wait_for_element('a.nbtcros-sectionpage--item', timeout=10)
+                return True
+            except Exception:
+                self.log("Session expired, logging in again...", "yellow")
+        return self.login(sb)
+
     def handle_cloudflare(self, sb):
         try:
             if sb.is_element_visible("div.cf-browser-verification"):
@@ -92,6 +367,8 @@ class NBTCSeleniumBaseAgent:
         try:
             self.log("Logging in...", "cyan")
             sb.uc_open_with_reconnect(self.login_url, reconnect_time=3)
+            # uc_open_with_reconnect replaces the main tab, dropping its CDP blocking state
+            self.apply_resource_blocking(sb)
             sb.sleep(2)
             self.handle_cloudflare(sb)
             sb.type("#UserName", self.username)
@@ -99,13 +376,53 @@ class NBTCSeleniumBaseAgent:
             sb.click("#bLogin")
             sb.sleep(3)
             sb.wait_for_element('a.nbtcros-sectionpage--item', timeout=15)
+            self.home_url = sb.get_current_url()
+            self.measure_page(sb, "home")
             self.log("Login successful", "green")
             return True
         except Exception as e:
             self.log(f"Login failed: {e}", "red")
+            return self.fail(TRANSIENT, "login failed")
+
+    def load_deep_link(self, sb, url, ready_selector, timeout=10):
+        """Open url and return "ok", "login" (redirected to the login form) or "error"."""
+        try:
+            sb.open(url)
+            for _ in range(timeout * 2):
+                if sb.is_element_present("#UserName"):
+                    return "login"
+                if sb.is_element_present(ready_selector):
+                    return "ok"
+                sb.sleep(0.5)
+        except Exception:
+            pass
+        return "error"
+
+    def open_deep_link(self, sb, url, ready_selector):
+        # A fresh or recycled browser has no session yet: log in before trying the link
+        if self.home_url is None and not self.login(sb):
             return False
+        status = self.load_deep_link(sb, url, ready_selector)
+        if status == "login":
+            self.log("Session expired, logging in again...", "yellow")
+            self.home_url = None
+            if not self.login(sb):
+                return False
+            status = self.load_deep_link(sb, url, ready_selector)
+        return status == "ok"
 
     def navigate_to_fm_standards(self, sb):
+        if self.search_url:
+            if self.open_deep_link(sb, self.search_url, 'a[href*="fno=add"]'):
+                self.measure_page(sb, "search")
+                self.log("Navigation complete (direct)", "green")
+                return True
+            if self.home_url is None:
+                return False
+            self.log("Search page deep link failed, using menus", "yellow")
+            self.search_url = None
+            if not self.ensure_session(sb):
+                return False
         try:
             self.log("Navigating to FM standards...", "cyan")
             sb.wait_for_element('a.nbtcros-sectionpage--item[onclick*="Oper"]')
@@ -120,34 +437,140 @@ class NBTCSeleniumBaseAgent:
             sb.wait_for_element('a[href*="FF11ChkSch"]', timeout=10)
             sb.click('a[href*="FF11ChkSch"]')
             sb.sleep(3)
+            sb.wait_for_element('a[href*="fno=add"]', timeout=10)
+            self.search_url = sb.get_current_url()
+            self.measure_page(sb, "search")
             self.log("Navigation complete", "green")
             return True
         except Exception as e:
             self.log(f"Navigation failed: {e}", "red")
-            return False
+            return self.fail(TRANSIENT, "navigation failed")
+
+    def open_add_form(self, sb):
+        """Open the fno=add form directly once its URL is known, else via the menus."""
+        if self.add_form_url:
+            if self.open_deep_link(sb, self.add_form_url, 'button:contains("ค้นหา")'):
+                self.measure_page(sb, "add form")
+                self.log("Add form opened (direct)", "green")
+                return True
+            if self.home_url is None:
+                # Login failed, the cached URL is not at fault
+                self.close_browser()
+                return False
+            self.log("Add form deep link failed, using menus", "yellow")
+            self.add_form_url = None
 
-    def add_fm_station(self, sb, fm_number):
+        if not self.ensure_session(sb):
+            self.close_browser()
+            return False
+        if not self.navigate_to_fm_standards(sb):
+            return False
         try:
-            self.log(f"Adding FM station: {fm_number}", "cyan")
-            sb.wait_for_element('a[href*="fno=add"]', timeout=10)
             sb.click('a[href*="fno=add"]')
             sb.sleep(3)
             sb.wait_for_element('button:contains("ค้นหา")', timeout=10)
-            sb.click('button:contains("ค้นหา")')
-            sb.sleep(3)
-            sb.wait_for_element('iframe[src*="mStnSch"]', timeout=10)
+            self.add_form_url = sb.get_current_url()
+            self.measure_page(sb, "add form")
+            return True
+        except Exception as e:
+            self.log(f"Open add form failed: {e}", "red")
+            return self.fail(TRANSIENT, "add form failed to load")
+
+    def open_station_search(self, sb):
+        sb.click('button:contains("ค้นหา")')
+        sb.sleep(3)
+        sb.wait_for_element('iframe[src*="mStnSch"]', timeout=10)
+        self.station_search_url = sb.execute_script(
+            'return document.querySelector(\'iframe[src*="mStnSch"]\').src'
+        )
+
+    def wait_for_search_postback(self, sb, timeout=20):
+        for _ in range(timeout * 2):
+            sb.sleep(0.5)
+            try:
+                if sb.execute_script(SEARCH_DONE_JS):
+                    return True
+            except Exception:
+                pass  # page is mid-navigation
+        return False
+
+    def search_station_rows(self, sb, fm_number, ref=None, click=False):
+        """Search the station list; returns None if the result postback did not finish."""
+        sb.select_option_by_text("#StnTypeID", "สถานีวิทยุกระจายเสียง")
+        sb.type("#SiteCode", fm_number)
+        sb.execute_script(MARK_SEARCH_PENDING_JS)
+        sb.click('button:contains("ค้นหา")')
+        if not self.wait_for_search_postback(sb, self.search_timeout):
+            return None
+        return sb.execute_script(FIND_STATION_ROWS_JS, fm_number, ref, click)
+
+    def prefetch_stations(self, codes):
+        """Resolve station codes in one search tab before any form filling.
+
+        Only resolved ("ok") codes are cached; missing or ambiguous codes are
+        looked up again in every batch.
+        """
+        resolved = {c: self.station_refs[c] for c in codes if c in self.station_refs}
+        pending = [c for c in codes if c not in resolved]
+        if pending:
+            self.log(f"Pre-flight: resolving {len(pending)} station codes...", "cyan")
+            sb = self.open_browser()
+            if not self.open_add_form(sb):
+                self.log("Pre-flight skipped: add form unavailable", "yellow")
+                return {}
+            try:
+                self.open_station_search(sb)
+                main_handle = self.open_new_tab_js(sb, self.station_search_url)
+            except Exception as e:
+                self.log(f"Pre-flight skipped: {e}", "yellow")
+                return {}
+            try:
+                if not self.wait_for_element_js(sb, "SiteCode", timeout=15):
+                    self.log("Pre-flight skipped: station search failed to load", "yellow")
+                    return resolved
+                for code in pending:
+                    result = self.search_station_rows(sb, code)
+                    if result is None:
+                        # Slow postback: leave unresolved, add_fm_station searches again
+                        self.log(f"Pre-flight: search for {code} timed out", "yellow")
+                        continue
+                    matches = result["matches"]
+                    if len(matches) == 1:
+                        self.station_refs[code] = {"status": "ok", **matches[0]}
+                        resolved[code] = self.station_refs[code]
+                    elif matches:
+                        resolved[code] = {"status": "ambiguous", "ref": None,
+                                          "text": f"{len(matches)} matching rows"}
+                    else:
+                        resolved[code] = {"status": "missing", "ref": None, "text": ""}
+            except Exception as e:
+                self.log(f"Pre-flight error: {e}", "yellow")
+            finally:
+                self.close_tab_and_return(sb, main_handle)
+        return resolved
+
+    def add_fm_station(self, sb, fm_number):
+        known = self.station_refs.get(fm_number)
+        try:
+            self.log(f"Adding FM station: {fm_number}", "cyan")
+            self.open_station_search(sb)
             sb.uc_switch_to_frame('iframe[src*="mStnSch"]')
-            sb.select_option_by_text("#StnTypeID", "สถานีวิทยุกระจายเสียง")
-            sb.type("#SiteCode", fm_number)
-            sb.click('button:contains("ค้นหา")')
-            sb.sleep(3)
-            sb.click('a:contains("1")')
+            result = self.search_station_rows(sb, fm_number, known["ref"] if known else None, click=True)
             sb.switch_to_default_content()
+            if result is None:
+                self.log(f"Station search for {fm_number} timed out", "red")
+                return self.fail(TRANSIENT, "station search timed out")
+            if not result["matches"]:
+                self.log(f"Station {fm_number} not found in search", "red")
+                return self.fail(PERMANENT, "station not found")
+            if not result["clicked"]:
+                self.log(f"Station {fm_number} matches {len(result['matches'])} rows", "red")
+                return self.fail(PERMANENT, "station ambiguous")
             self.log(f"FM station {fm_number} selected", "green")
             return True
         except Exception as e:
             self.log(f"Add station failed: {e}", "red")
-            return False
+            return self.fail(TRANSIENT, "station search failed")
 
     def fill_panel1(self, sb):
         try:
@@ -165,16 +588,16 @@ class NBTCSeleniumBaseAgent:
                 if freq_value:
                     sb.type("#DetFrq", freq_value)
             if sb.is_element_present('#CableID'):
-                sb.select_option_by_text('#CableID', "Heliax7/8")
+                sb.select_option_by_text('#CableID', self.default_cable)
             if sb.is_element_present('#DetPow'):
                 if not sb.execute_script('return document.getElementById("DetPow").value'):
-                    sb.type("#DetPow", "500")
+                    sb.type("#DetPow", self.default_power)
             if sb.is_element_present('#DetDBI'):
                 if not sb.execute_script('return document.getElementById("DetDBI").value'):
-                    sb.type("#DetDBI", "6")
+                    sb.type("#DetDBI", self.default_gain)
             if sb.is_element_present('#DetAntHeight'):
                 if not sb.execute_script('return document.getElementById("DetAntHeight").value'):
-                    sb.type("#DetAntHeight", "60")
+                    sb.type("#DetAntHeight", self.default_ant_height)
             self.log("Panel 1: Station details filled", "green")
             return True
         except Exception as e:
@@ -183,13 +606,19 @@ class NBTCSeleniumBaseAgent:
 
     def open_new_tab_js(self, sb, url):
         main_handle = sb.driver.current_window_handle
-        sb.execute_script(f'window.open("{url}", "_blank")')
-        sb.sleep(3)
+        # Blocking is per tab, so open blank, block, then navigate
+        first_url = "about:blank" if self.block_resources else url
+        sb.execute_script(f'window.open("{first_url}", "_blank")')
+        sb.sleep(1 if self.block_resources else 3)
         handles = sb.driver.window_handles
         for h in handles:
             if h != main_handle:
                 sb.driver.switch_to.window(h)
                 break
+        if self.block_resources:
+            self.apply_resource_blocking(sb)
+            sb.execute_script(f'window.location.href = "{url}"')
+            sb.sleep(2)
         sb.sleep(2)
         return main_handle
 
@@ -209,16 +638,53 @@ class NBTCSeleniumBaseAgent:
             sb.sleep(1)
         return False
 
+    def select_lookup_js(self, sb, field_id, search, parent="", cached=None, add_missing=False):
+        """Select the option matching search; cached is a LookupCache entry to set directly."""
+        result = sb.execute_script(f'''
+            var el = document.getElementById("{field_id}");
+            if (!el) return null;
+            var search = {json.dumps(search)};
+            var value = {json.dumps(cached["value"] if cached else None)};
+            var text = {json.dumps(cached["text"] if cached else None)};
+            if (value === null) {{
+                for (var i = 0; i < el.options.length; i++) {{
+                    if (el.options[i].text.indexOf(search) >= 0) {{
+                        value = el.options[i].value;
+                        text = el.options[i].text;
+                        break;
+                    }}
+                }}
+                if (value === null) return null;
+            }} else {{
+                var found = false;
+                for (var i = 0; i < el.options.length; i++) {{
+                    if (el.options[i].value === value) {{ found = true; break; }}
+                }}
+                if (!found) {{
+                    if (!{json.dumps(add_missing)}) return null;
+                    el.add(new Option(text, value));
+                }}
+            }}
+            el.value = value;
+            if (typeof $ !== "undefined") $("#{field_id}").selectpicker("refresh");
+            return el.value === value ? [value, text] : null;
+        ''')
+        if result and not cached:
+            self.lookups.put(field_id, parent, search, result[0], result[1])
+        return result
+
     def fill_fq_item(self, sb, tmp_key, pattern):
         fq_url = f"{FORM_BASE_URL}/mFF11FqDoc.aspx?ChkID=&TmpKey={tmp_key}&ChkFqID=0&r={rid()}"
         main_handle = self.open_new_tab_js(sb, fq_url)
+        submitted = False
         try:
             if not self.wait_for_element_js(sb, "DiffPara", timeout=15):
                 page_url = sb.execute_script('return window.location.href')
                 self.log(f"FQ tab failed to load. URL: {page_url}", "red")
                 self.close_tab_and_return(sb, main_handle)
-                return False
+                return self.fail(TRANSIENT, "fq tab failed to load")
 
+            self.measure_page(sb, "fq tab")
             sb.execute_script(f'''
                 document.getElementById("DiffPara").value = "{pattern}";
                 if (typeof $ !== "undefined") $("#DiffPara").selectpicker("refresh");
@@ -226,6 +692,7 @@ class NBTCSeleniumBaseAgent:
                 if (typeof $ !== "undefined") $("#DiffRes").selectpicker("refresh");
             ''')
             sb.sleep(1)
+            submitted = True
             sb.execute_script(
                 "if (typeof(Page_ClientValidate) == 'function') Page_ClientValidate('');"
                 " __doPostBack('ctl15','')"
@@ -245,26 +712,29 @@ class NBTCSeleniumBaseAgent:
                 self.close_tab_and_return(sb, main_handle)
             except Exception:
                 pass
-            return False
+            return self.fail_item(submitted, "fq item error")
 
     def fill_pic_item(self, sb, tmp_key, pic_file, pattern):
         doc_url = f"{FORM_BASE_URL}/mFF11Doc.aspx?ChkID=&TmpKey={tmp_key}&ChkPicID=0&r={rid()}"
         main_handle = self.open_new_tab_js(sb, doc_url)
+        submitted = False
         try:
             if not self.wait_for_element_js(sb, "PicTypeID", timeout=15):
                 page_url = sb.execute_script('return window.location.href')
                 self.log(f"Pic tab failed to load. URL: {page_url}", "red")
                 self.close_tab_and_return(sb, main_handle)
-                return False
+                return self.fail(TRANSIENT, "pic tab failed to load")
 
+            self.measure_page(sb, "pic tab")
             sb.execute_script('''
                 document.getElementById("PicTypeID").value = "1";
                 if (typeof $ !== "undefined") $("#PicTypeID").selectpicker("refresh");
             ''')
             sb.sleep(1)
 
+            upload_file, original_size, upload_size = self.uploads.prepare(pic_file)
             file_input = sb.driver.find_element("css selector", "#File1")
-            file_input.send_keys(str(pic_file.resolve()))
+            file_input.send_keys(str(upload_file.resolve()))
             sb.sleep(2)
 
             remark_text = self.analyzer.get_remark_text(pattern) or ""
@@ -272,17 +742,28 @@ class NBTCSeleniumBaseAgent:
             sb.execute_script(f"document.getElementById('Remark').value = '{remark_text}'")
             sb.sleep(1)
 
+            submitted = True
+            # The file is sent with the postback; earlier steps only set the path
+            upload_start = time.time()
             sb.execute_script(
                 "if (typeof(Page_ClientValidate) == 'function') Page_ClientValidate('');"
                 " __doPostBack('ctl15','')"
             )
-            sb.sleep(5)
-            try:
-                if sb.is_element_visible("button.confirm"):
-                    sb.click("button.confirm")
-                    sb.sleep(1)
-            except Exception:
-                pass
+            # Same 5 s cap as before, but smaller uploads confirm sooner
+            for _ in range(10):
+                sb.sleep(0.5)
+                try:
+                    if sb.is_element_visible("button.confirm"):
+                        sb.click("button.confirm")
+                        sb.sleep(1)
+                        break
+                except Exception:
+                    pass
+            self.last_upload = {
+                "original": original_size,
+                "uploaded": upload_size,
+                "seconds": time.time() - upload_start,
+            }
             self.close_tab_and_return(sb, main_handle)
             return True
         except Exception as e:
@@ -291,7 +772,7 @@ class NBTCSeleniumBaseAgent:
                 self.close_tab_and_return(sb, main_handle)
             except Exception:
                 pass
-            return False
+            return self.fail_item(submitted, "pic item error")
 
     def fill_equipment(self, sb, tmp_key, area_id, equ_type_id, equ_name_search):
         equ_url = (
@@ -299,37 +780,42 @@ class NBTCSeleniumBaseAgent:
             f"?ff=F11&ChkID=&AreaID={area_id}&TmpKey={tmp_key}&ChkEquID=0&r={rid()}"
         )
         main_handle = self.open_new_tab_js(sb, equ_url)
+        submitted = False
+        used_cache = False
         try:
             if not self.wait_for_element_js(sb, "EquTypeID", timeout=15):
                 page_url = sb.execute_script('return window.location.href')
                 self.log(f"Equ tab failed to load. URL: {page_url}", "red")
                 self.close_tab_and_return(sb, main_handle)
-                return False
+                return self.fail(TRANSIENT, "equ tab failed to load")
 
+            self.measure_page(sb, "equ tab")
+            # With a cached EquID value the dependent list does not need to load
+            cached = self.lookups.get("EquID", equ_type_id, equ_name_search)
+            trigger = "" if cached else '$("#EquTypeID").trigger("change");'
             sb.execute_script(f'''
                 document.getElementById("EquTypeID").value = "{equ_type_id}";
                 if (typeof $ !== "undefined") {{
                     $("#EquTypeID").selectpicker("refresh");
-                    $("#EquTypeID").trigger("change");
+                    {trigger}
                 }}
             ''')
-            sb.sleep(3)
 
-            self.wait_for_element_js(sb, "EquID", timeout=10)
-            sb.execute_script(f'''
-                var el = document.getElementById("EquID");
-                if (el) {{
-                    for (var i = 0; i < el.options.length; i++) {{
-                        if (el.options[i].text.indexOf("{equ_name_search}") >= 0) {{
-                            el.value = el.options[i].value;
-                            break;
-                        }}
-                    }}
-                    if (typeof $ !== "undefined") $("#EquID").selectpicker("refresh");
-                }}
-            ''')
+            selected = cached and self.select_lookup_js(
+                sb, "EquID", equ_name_search, parent=equ_type_id, cached=cached, add_missing=True
+            )
+            used_cache = bool(selected)
+            if not selected:
+                if cached:
+                    self.lookups.invalidate("EquID", equ_type_id, equ_name_search)
+                    sb.execute_script('if (typeof $ !== "undefined") $("#EquTypeID").trigger("change");')
+                sb.sleep(3)
+                self.wait_for_element_js(sb, "EquID", timeout=10)
+                if not self.select_lookup_js(sb, "EquID", equ_name_search, parent=equ_type_id):
+                    self.log(f"Equipment option not found: {equ_name_search}", "yellow")
             sb.sleep(1)
 
+            submitted = True
             sb.execute_script(
                 "if (typeof(Page_ClientValidate) == 'function') Page_ClientValidate('');"
                 " __doPostBack('ctl15','')"
@@ -345,11 +831,14 @@ class NBTCSeleniumBaseAgent:
             return True
         except Exception as e:
             self.log(f"Equ item error: {e}", "red")
+            if used_cache:
+                # The cached EquID may be what the server rejected; rescan next time
+                self.lookups.invalidate("EquID", equ_type_id, equ_name_search)
             try:
                 self.close_tab_and_return(sb, main_handle)
             except Exception:
                 pass
-            return False
+            return self.fail_item(submitted, "equ item error")
 
     def fill_station_details(self, sb, pictures_folder):
         try:
@@ -364,26 +853,31 @@ class NBTCSeleniumBaseAgent:
 
             if not picture_files:
                 self.log("[1/7] No picture files found", "red")
-                return False
+                return self.fail(PERMANENT, "no picture files")
 
-            image_analysis = []
-            for pic_file in picture_files:
-                pattern_type, date_text = self.analyzer.analyze_spectrum(str(pic_file))
-                image_analysis.append({"file": pic_file, "pattern": pattern_type, "date": date_text})
+            # OCR and date parsing are local: the same pictures fail the same way on retry
+            try:
+                image_analysis = []
+                for pic_file in picture_files:
+                    pattern_type, date_text = self.analyzer.analyze_spectrum(str(pic_file))
+                    image_analysis.append({"file": pic_file, "pattern": pattern_type, "date": date_text})
 
-            first_date = None
-            for item in image_analysis:
-                if item["date"] and item["date"][0]:
-                    first_date = item["date"][0]
-                    break
+                first_date = None
+                for item in image_analysis:
+                    if item["date"] and item["date"][0]:
+                        first_date = item["date"][0]
+                        break
 
-            if not first_date:
-                self.log("[1/7] No date found in images, using default", "yellow")
-                first_date = "01/01/25"
+                if not first_date:
+                    self.log("[1/7] No date found in images, using default", "yellow")
+                    first_date = "01/01/25"
 
-            day, month, year = first_date.split("/")
-            buddhist_year = 2000 + int(year) + 543
-            formatted_date = f"{day.zfill(2)}/{month.zfill(2)}/{buddhist_year}"
+                day, month, year = first_date.split("/")
+                buddhist_year = 2000 + int(year) + 543
+                formatted_date = f"{day.zfill(2)}/{month.zfill(2)}/{buddhist_year}"
+            except Exception as e:
+                self.log(f"[1/7] Image analysis failed: {e}", "red")
+                return self.fail(PERMANENT, "image analysis failed")
 
             today = datetime.date.today()
             today_thai = f"{today.day:02d}/{today.month:02d}/{today.year + 543}"
@@ -414,7 +908,7 @@ class NBTCSeleniumBaseAgent:
             self.log(f"[3/7] Panel 2: Frequency details ({len(unique_patterns)} patterns)...", "cyan")
             try:
                 for pattern in unique_patterns:
-                    success = self.fill_fq_item(sb, tmp_key, pattern)
+                    success = self.with_retry(f"FQ {pattern}", self.fill_fq_item, sb, tmp_key, pattern)
                     if success:
                         self.log(f"       + {pattern}", "green")
                     else:
@@ -432,9 +926,18 @@ class NBTCSeleniumBaseAgent:
                 for item in image_analysis:
                     pic_file = item["file"]
                     pattern = item["pattern"]
-                    success = self.fill_pic_item(sb, tmp_key, pic_file, pattern)
+                    self.last_upload = None
+                    success = self.with_retry(
+                        f"Pic {pic_file.name}", self.fill_pic_item, sb, tmp_key, pic_file, pattern
+                    )
                     if success:
-                        self.log(f"       + {pic_file.name}", "green")
+                        u = self.last_upload
+                        self.station_uploads.append(u)
+                        self.log(
+                            f"       + {pic_file.name} ({format_size(u['original'])} -> "
+                            f"{format_size(u['uploaded'])}, {u['seconds']:.1f}s)",
+                            "green",
+                        )
                     else:
                         self.log(f"       x {pic_file.name}", "red")
 
@@ -452,7 +955,10 @@ class NBTCSeleniumBaseAgent:
                     ("12", "ชุดเครื่องมือวัดแพร่แปลกปลอม"),
                 ]
                 for equ_type_id, equ_name_search in equipment_list:
-                    success = self.fill_equipment(sb, tmp_key, area_id, equ_type_id, equ_name_search)
+                    success = self.with_retry(
+                        f"Equ {equ_name_search}", self.fill_equipment,
+                        sb, tmp_key, area_id, equ_type_id, equ_name_search,
+                    )
                     if success:
                         sb.execute_script('loadItemEqu()')
                         sb.sleep(3)
@@ -482,17 +988,12 @@ class NBTCSeleniumBaseAgent:
                 self.log(f"[6/7] Opinion error: {e}", "yellow")
 
             try:
-                sb.execute_script('''
-                    var el = document.getElementById("TestEq");
-                    if (el) {
-                        for (var i = 0; i < el.options.length; i++) {
-                            if (el.options[i].text.indexOf("H-FSH8") >= 0) {
-                                el.selectedIndex = i; break;
-                            }
-                        }
-                        if (typeof $ !== "undefined") $("#TestEq").selectpicker("refresh");
-                    }
-                ''')
+                cached = self.lookups.get("TestEq", "", "H-FSH8")
+                if not self.select_lookup_js(sb, "TestEq", "H-FSH8", cached=cached):
+                    if cached:
+                        self.lookups.invalidate("TestEq", "", "H-FSH8")
+                    if not cached or not self.select_lookup_js(sb, "TestEq", "H-FSH8"):
+                        self.log("[6/7] Test equipment option not found: H-FSH8", "yellow")
                 sb.sleep(1)
             except Exception as e:
                 self.log(f"[6/7] Test equipment error: {e}", "yellow")
@@ -531,10 +1032,12 @@ class NBTCSeleniumBaseAgent:
 
             # --- [7/7] Save ---
             self.log("[7/7] Saving form...", "cyan")
+            submitted = False
             try:
                 sb.execute_script('window.scrollTo(0, document.body.scrollHeight)')
                 sb.sleep(2)
 
+                submitted = True
                 save_result = sb.execute_script('''
                     if (typeof Page_ClientValidate === 'function') {
                         var isValid = Page_ClientValidate('');
@@ -553,9 +1056,10 @@ class NBTCSeleniumBaseAgent:
                 ''')
 
                 if str(save_result).startswith("VALIDATION_FAILED"):
+                    submitted = False
                     failed_validators = str(save_result).split(":")[1]
                     self.log(f"[7/7] Validation failed: {failed_validators}", "red")
-                    return False
+                    return self.fail(PERMANENT, f"validation failed: {failed_validators}")
 
                 sb.sleep(8)
 
@@ -569,34 +1073,52 @@ class NBTCSeleniumBaseAgent:
                 self.log("[7/7] Form saved", "green")
             except Exception as e:
                 self.log(f"[7/7] Save failed: {e}", "red")
-                return False
+                return self.fail_item(submitted, "save failed")
 
             return True
+        except WebDriverException as e:
+            self.log(f"Fill details failed: {e}", "red")
+            return self.fail(TRANSIENT, "fill details failed")
         except Exception as e:
             self.log(f"Fill details failed: {e}", "red")
-            return False
+            return self.fail(PERMANENT, "fill details failed")
 
-    def run_automation(self, fm_folder):
-        start_time = time.time()
+    def attempt_station(self, fm_folder):
+        fm_number = Path(fm_folder).name
+        self.station_uploads = []
         try:
-            fm_number = Path(fm_folder).name
-
-            with SB(uc=True, test=True, incognito=True, locale="th", headless=False) as sb:
-                if not self.login(sb):
-                    return False, 0
-                if not self.navigate_to_fm_standards(sb):
-                    return False, 0
-                if not self.add_fm_station(sb, fm_number):
-                    return False, 0
-                if not self.fill_station_details(sb, fm_folder):
-                    return False, 0
-
-            elapsed = time.time() - start_time
-            return True, elapsed
+            sb = self.open_browser()
+
+            if not self.open_add_form(sb):
+                return False
+            if not self.add_fm_station(sb, fm_number):
+                return False
+            return self.fill_station_details(sb, fm_folder)
         except Exception as e:
             self.log(f"Automation failed: {e}", "red")
-            elapsed = time.time() - start_time
-            return False, elapsed
+            self.close_browser()
+            return self.fail(TRANSIENT, "browser error")
+
+    def run_automation(self, fm_folder):
+        start_time = time.time()
+        fm_number = Path(fm_folder).name
+        self.failure = None
+        self.station_retries = 0
+        try:
+            success = self.with_retry(fm_number, self.attempt_station, fm_folder)
+            if success:
+                # Only the attempt that saved the record counts towards bytes saved
+                for u in self.station_uploads:
+                    self.uploads.record(u["original"], u["uploaded"])
+            return success, time.time() - start_time
+        finally:
+            self.record_station_resources(fm_number)
+
+
+def format_size(num_bytes):
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / 1024 / 1024:.1f} MB"
+    return f"{num_bytes / 1024:.0f} KB"
 
 
 def format_elapsed(seconds):
@@ -604,13 +1126,240 @@ def format_elapsed(seconds):
     return f"{m}m {s:02d}s" if m else f"{s}s"
 
 
+def format_memory(sample):
+    return f"{sample['total_mb']:.0f} MB" if sample else "--"
+
+
+def process_station(automation, folder, completed_dir, console):
+    result = {"station": folder.name, "folder": str(folder), "retries": 0, "kind": None, "note": ""}
+    try:
+        automation.last_sample = None
+        success, elapsed = automation.run_automation(str(folder))
+        result["memory"] = format_memory(automation.last_sample)
+        result["time"] = format_elapsed(elapsed)
+        result["retries"] = automation.station_retries
+        if success:
+            dest = completed_dir / folder.name
+            if dest.exists():
+                shutil.rmtree(dest)
+            shutil.move(str(folder), str(dest))
+            console.print(f"  [green]OK[/green] {folder.name} -> completed/ ({format_elapsed(elapsed)})\n")
+            result["status"] = "OK"
+            return result
+        kind, reason = automation.failure or (TRANSIENT, "unknown error")
+        console.print(f"  [red]FAILED[/red] {folder.name} ({format_elapsed(elapsed)}) - {kind}: {reason}\n")
+        result.update({"status": "FAILED", "kind": kind, "note": f"{kind}: {reason}"})
+        return result
+    except Exception as e:
+        console.print(f"  [red]ERROR[/red] {folder.name}: {e}\n")
+        result.update({"status": "ERROR", "time": "--", "memory": "--", "note": str(e)})
+        return result
+
+
+def run_preflight(automation, folders, console):
+    if not automation.station_preflight or not folders:
+        return folders, []
+    resolved = automation.prefetch_stations([f.name for f in folders])
+    valid, invalid = [], []
+    for folder in folders:
+        info = resolved.get(folder.name)
+        if info and info["status"] != "ok":
+            note = f"{PERMANENT}: station {info['status']}"
+            if info["text"]:
+                note += f" ({info['text']})"
+            invalid.append({
+                "station": folder.name, "folder": str(folder), "status": "INVALID", "time": "--",
+                "memory": "--", "retries": 0, "kind": PERMANENT, "note": note,
+            })
+        else:
+            valid.append(folder)
+    if invalid:
+        lines = "\n".join(f"  [red]{r['station']}[/red]  {r['note']}" for r in invalid)
+        console.print(Panel(lines, title="Pre-flight: skipped stations", border_style="red"))
+    else:
+        console.print(f"  [green]OK[/green] Pre-flight: all {len(folders)} station codes resolved\n")
+    return valid, invalid
+
+
+def run_deferred_pass(automation, results, completed_dir, console):
+    deferred = [r for r in results if r["status"] == "FAILED" and r["kind"] == TRANSIENT and not r.get("deferred")]
+    if not deferred:
+        return
+    console.print(Panel(
+        f"  Retrying [bold]{len(deferred)}[/bold] station(s) that failed with transient errors",
+        title="Deferred Retry Pass",
+        border_style="yellow",
+    ))
+    for r in deferred:
+        retry = process_station(automation, Path(r["folder"]), completed_dir, console)
+        retry["retries"] += r["retries"] + 1
+        retry["deferred"] = True
+        if retry["status"] == "OK":
+            retry["note"] = "recovered in deferred pass"
+        r.update(retry)
+
+
+def print_summary(console, results, automation=None):
+    table = Table(title="Summary", border_style="cyan", show_lines=True)
+    table.add_column("Station", style="bold")
+    table.add_column("Status", justify="center")
+    table.add_column("Time", justify="right")
+    table.add_column("Memory", justify="right")
+    table.add_column("Retries", justify="right")
+    table.add_column("Note")
+
+    ok_count = 0
+    for r in results:
+        status_style = "green" if r["status"] == "OK" else "red"
+        table.add_row(
+            r["station"], f"[{status_style}]{r['status']}[/{status_style}]",
+            r["time"], r["memory"], str(r["retries"]), r["note"],
+        )
+        if r["status"] == "OK":
+            ok_count += 1
+
+    console.print()
+    console.print(table)
+    fail_count = len(results) - ok_count
+    total_retries = sum(r["retries"] for r in results)
+    console.print(
+        f"\n  [bold]{ok_count}[/bold] succeeded, [bold]{fail_count}[/bold] failed,"
+        f" [bold]{total_retries}[/bold] retries"
+    )
+    if automation is not None:
+        monitor = automation.monitor
+        console.print(
+            f"  Memory: peak [bold]{monitor.peak_mb():.0f} MB[/bold],"
+            f" average [bold]{monitor.average_mb():.0f} MB[/bold]"
+            f" ({automation.recycle_count} browser recycles)"
+        )
+        lookups = automation.lookups
+        if lookups.enabled and lookups.hits + lookups.misses:
+            console.print(f"  Lookup cache: {lookups.hits} hits, {lookups.misses} misses")
+        uploads = automation.uploads
+        if uploads.original_bytes:
+            console.print(
+                f"  Uploads: {format_size(uploads.original_bytes)} -> {format_size(uploads.upload_bytes)}"
+                f" ([bold]{format_size(uploads.saved_bytes)}[/bold] saved)"
+            )
+        print_page_stats(console, automation)
+    console.print()
+
+
+def print_page_stats(console, automation):
+    if not automation.page_stats:
+        return
+    blocking = "on" if automation.block_resources else "off"
+    table = Table(
+        title=f"Page Loads (profile: {automation.run_profile}, blocking: {blocking})",
+        border_style="cyan",
+    )
+    table.add_column("Step", style="bold")
+    table.add_column("Loads", justify="right")
+    table.add_column("Avg KB", justify="right")
+    table.add_column("Avg ms", justify="right")
+    table.add_column("Avg requests", justify="right")
+    for step, entries in automation.page_stats.items():
+        n = len(entries)
+        table.add_row(
+            step,
+            str(n),
+            f"{sum(e['bytes'] for e in entries) / n / 1024:.0f}",
+            f"{sum(e['load_ms'] for e in entries) / n:.0f}",
+            f"{sum(e['requests'] for e in entries) / n:.1f}",
+        )
+    console.print(table)
+
+
+def watch(picture_dir, completed_dir):
+    console = Console()
+    stable_seconds = float(os.getenv("NBTC_WATCH_STABLE_SECONDS", "10"))
+    poll_interval = float(os.getenv("NBTC_WATCH_POLL_SECONDS", "2"))
+    keepalive = float(os.getenv("NBTC_WATCH_KEEPALIVE_SECONDS", "600"))
+
+    automation = NBTCSeleniumBaseAgent()
+    automation.load_inspectors_from_env()
+
+    watcher = StationWatcher(picture_dir, stable_seconds=stable_seconds)
+    watcher.start()
+    console.print(Panel(
+        f"  Watching [bold]{picture_dir}/[/bold] for new station folders\n"
+        f"  Stable after: {stable_seconds:g}s  |  Ctrl+C to stop",
+        title="NBTC FM Inspection Watch Mode",
+        border_style="cyan",
+    ))
+
+    results = []
+    # Zero so the first iteration logs in and warms the browser
+    last_activity = 0.0
+    errors = 0
+    try:
+        while True:
+            batch = []
+            try:
+                batch = watcher.ready_folders()
+                ready, invalid = run_preflight(automation, batch, console)
+                results.extend(invalid)
+                batch = list(ready)
+                for folder in ready:
+                    console.print(Panel(
+                        f"  [bold]{folder.name}[/bold]  (queued: {watcher.pending_count()})\n"
+                        f"  Navigate -> Select -> Fill -> Save",
+                        title=f"Station {len(results)+1}",
+                        border_style="blue",
+                    ))
+                    results.append(process_station(automation, folder, completed_dir, console))
+                    batch.remove(folder)
+                    last_activity = time.time()
+
+                if not ready and watcher.pending_count() == 0:
+                    run_deferred_pass(automation, results, completed_dir, console)
+
+                if time.time() - last_activity >= keepalive:
+                    automation.ensure_session(automation.open_browser())
+                    last_activity = time.time()
+                errors = 0
+            except Exception as e:
+                errors += 1
+                delay = min(300, poll_interval * 2 ** errors)
+                automation.log(f"Watch loop error: {e} - retrying in {delay:.0f}s", "red")
+                automation.close_browser()
+                # Put back folders that were taken from the queue but not processed
+                for folder in batch:
+                    watcher.touch(folder)
+                time.sleep(delay)
+                continue
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        console.print("\n[yellow]Stopping watch mode...[/yellow]")
+    finally:
+        watcher.stop()
+        automation.close_browser()
+
+    if results:
+        print_summary(console, results, automation)
+
+
 def main():
+    parser = argparse.ArgumentParser(description="NBTC FM Inspection Automation")
+    parser.add_argument("--watch", action="store_true",
+                        help="run non-interactively and process station folders as they arrive")
+    parser.add_argument("--config", help="extra .env-style config file (overrides .env)")
+    args = parser.parse_args()
+
+    if args.config:
+        load_dotenv(args.config, override=True)
+
     console = Console()
 
-    picture_dir = Path("picture")
-    completed_dir = Path("completed")
+    picture_dir = Path(os.getenv("NBTC_PICTURE_DIR", "picture"))
+    completed_dir = Path(os.getenv("NBTC_COMPLETED_DIR", "completed"))
     completed_dir.mkdir(exist_ok=True)
 
+    if args.watch:
+        watch(picture_dir, completed_dir)
+        return
+
     if not picture_dir.exists():
         console.print(Panel("[red]Picture directory not found[/red]", title="Error", border_style="red"))
         return
@@ -637,46 +1386,21 @@ def main():
     console.print()
     results = []
 
-    for idx, folder in enumerate(folders):
-        console.print(Panel(
-            f"  [bold]{folder.name}[/bold]  ({idx+1}/{len(folders)})\n"
-            f"  Login -> Navigate -> Select -> Fill -> Save",
-            title=f"Station {idx+1}/{len(folders)}",
-            border_style="blue",
-        ))
-
-        try:
-            success, elapsed = automation.run_automation(str(folder))
-            if success:
-                dest = completed_dir / folder.name
-                if dest.exists():
-                    shutil.rmtree(dest)
-                shutil.move(str(folder), str(dest))
-                console.print(f"  [green]OK[/green] {folder.name} -> completed/ ({format_elapsed(elapsed)})\n")
-                results.append({"station": folder.name, "status": "OK", "time": format_elapsed(elapsed)})
-            else:
-                console.print(f"  [red]FAILED[/red] {folder.name} ({format_elapsed(elapsed)})\n")
-                results.append({"station": folder.name, "status": "FAILED", "time": format_elapsed(elapsed)})
-        except Exception as e:
-            console.print(f"  [red]ERROR[/red] {folder.name}: {e}\n")
-            results.append({"station": folder.name, "status": "ERROR", "time": "--"})
-
-    table = Table(title="Summary", border_style="cyan", show_lines=True)
-    table.add_column("Station", style="bold")
-    table.add_column("Status", justify="center")
-    table.add_column("Time", justify="right")
-
-    ok_count = 0
-    for r in results:
-        status_style = "green" if r["status"] == "OK" else "red"
-        table.add_row(r["station"], f"[{status_style}]{r['status']}[/{status_style}]", r["time"])
-        if r["status"] == "OK":
-            ok_count += 1
-
-    console.print()
-    console.print(table)
-    fail_count = len(results) - ok_count
-    console.print(f"\n  [bold]{ok_count}[/bold] succeeded, [bold]{fail_count}[/bold] failed\n")
+    try:
+        folders, results = run_preflight(automation, folders, console)
+        for idx, folder in enumerate(folders):
+            console.print(Panel(
+                f"  [bold]{folder.name}[/bold]  ({idx+1}/{len(folders)})\n"
+                f"  Login -> Navigate -> Select -> Fill -> Save",
+                title=f"Station {idx+1}/{len(folders)}",
+                border_style="blue",
+            ))
+            results.append(process_station(automation, folder, completed_dir, console))
+        run_deferred_pass(automation, results, completed_dir, console)
+    finally:
+        automation.close_browser()
+
+    print_summary(console, results, automation)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""
+Synthetic benchmark corpus for AnalyzeSpectrum.
+Renders labelled dark 640x480 analyzer screenshots, plus off-size variants
+that exercise the full-image OCR fallback. Labels go to manifest.json.
+"""
+
+import json
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+PATTERNS = ["Unwanted Emission", "Bandwidth", "Frequency Deviation Limits"]
+OFF_SIZES = [(800, 600), (1280, 960), (480, 360)]
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+TEXT_COLOR = (235, 235, 235)
+GRID_COLOR = (55, 55, 55)
+TRACE_COLOR = (0, 200, 255)
+
+
+def _text(image, text, x, y, scale=0.42):
+    cv2.putText(image, text, (x, y), FONT, scale, TEXT_COLOR, 1, cv2.LINE_AA)
+
+
+def render_screenshot(pattern, date, clock, rng):
+    image = np.full((480, 640, 3), 18, dtype=np.uint8)
+
+    # Title bar and date: AnalyzeSpectrum.REGION_TITLE / REGION_DATE
+    cv2.rectangle(image, (0, 0), (639, 18), (40, 40, 40), -1)
+    _text(image, "Occupied BW" if pattern == "Bandwidth" else "Spectrum Analyzer", 4, 13)
+    _text(image, f"{date} {clock}", 445, 13)
+
+    # Limit line: AnalyzeSpectrum.REGION_UPPER
+    if pattern == "Frequency Deviation Limits":
+        _text(image, "Upper Limit: 75.0 kHz", 4, 94)
+    elif pattern == "Unwanted Emission":
+        _text(image, "Stop: 137.000 MHz", 4, 94)
+    else:
+        _text(image, f"OBW: {rng.uniform(150, 200):.1f} kHz", 4, 94)
+
+    for y in range(110, 441, 33):
+        cv2.line(image, (20, y), (620, y), GRID_COLOR, 1)
+    for x in range(20, 621, 60):
+        cv2.line(image, (x, 110), (x, 440), GRID_COLOR, 1)
+
+    xs = np.arange(20, 620)
+    width = 18 if pattern == "Bandwidth" else 40
+    peak = 200 * np.exp(-((xs - 320) / width) ** 2)
+    ys = np.clip(420 - peak + rng.normal(0, 4, xs.size), 110, 440).astype(np.int32)
+    cv2.polylines(image, [np.stack([xs, ys], axis=1).reshape(-1, 1, 2)], False, TRACE_COLOR, 1)
+
+    center = 112.0 if pattern == "Unwanted Emission" else round(rng.uniform(88, 108), 1)
+    _text(image, f"Center: {center} MHz", 4, 465)
+    return image
+
+
+def generate_corpus(out_dir, count=60, offsize_ratio=0.2, seed=0):
+    """Write count labelled images and manifest.json to out_dir; returns the manifest."""
+    rng = np.random.default_rng(seed)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = []
+    for i in range(count):
+        pattern = PATTERNS[i % len(PATTERNS)]
+        date = f"{rng.integers(1, 29):02d}/{rng.integers(1, 13):02d}/{rng.integers(23, 27):02d}"
+        clock = f"{rng.integers(8, 18):02d}:{rng.integers(0, 60):02d}:{rng.integers(0, 60):02d}"
+        image = render_screenshot(pattern, date, clock, rng)
+
+        variant = "standard"
+        if rng.random() < offsize_ratio:
+            width, height = OFF_SIZES[rng.integers(len(OFF_SIZES))]
+            image = cv2.resize(image, (width, height), interpolation=cv2.INTER_LINEAR)
+            variant = f"{width}x{height}"
+
+        name = f"Measurement_{i:03d}.png"
+        cv2.imwrite(str(out_dir / name), image)
+        manifest.append({"file": name, "pattern": pattern, "date": date, "variant": variant})
+
+    (out_dir / "manifest.json").write_text(json.dumps(manifest, indent=2))
+    return manifest
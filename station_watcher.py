@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+Watches picture/ for new FM station folders.
+Uses watchdog (inotify on Linux) and debounces each folder until its files stop changing.
+"""
+
+import threading
+import time
+from pathlib import Path
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg"}
+
+
+class _StationEventHandler(FileSystemEventHandler):
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        self.watcher.touch(event.src_path)
+        dest_path = getattr(event, "dest_path", None)
+        if dest_path:
+            self.watcher.touch(dest_path)
+
+
+class StationWatcher:
+
+    def __init__(self, picture_dir, stable_seconds=10):
+        self.picture_dir = Path(picture_dir).resolve()
+        self.stable_seconds = stable_seconds
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._observer = Observer()
+
+    def start(self):
+        self.picture_dir.mkdir(exist_ok=True)
+        for folder in sorted(self.picture_dir.iterdir()):
+            if folder.is_dir():
+                self.touch(folder)
+        self._observer.schedule(_StationEventHandler(self), str(self.picture_dir), recursive=True)
+        self._observer.start()
+
+    def stop(self):
+        self._observer.stop()
+        self._observer.join(timeout=5)
+
+    def station_folder(self, path):
+        try:
+            relative = Path(path).resolve().relative_to(self.picture_dir)
+        except ValueError:
+            return None
+        if not relative.parts:
+            return None
+        return self.picture_dir / relative.parts[0]
+
+    def touch(self, path):
+        folder = self.station_folder(path)
+        if folder is None:
+            return
+        with self._lock:
+            if folder.is_dir():
+                self._pending[folder] = (None, time.monotonic())
+            else:
+                self._pending.pop(folder, None)
+
+    def snapshot(self, folder):
+        try:
+            return tuple(sorted(
+                (f.name, f.stat().st_size, f.stat().st_mtime_ns)
+                for f in folder.iterdir()
+                if f.is_file() and f.suffix.lower() in IMAGE_SUFFIXES
+            ))
+        except FileNotFoundError:
+            return None
+
+    def ready_folders(self):
+        """Return folders whose image files have not changed for stable_seconds.
+
+        Folders that stay without images are dropped; a later file event queues them again.
+        """
+        now = time.monotonic()
+        ready = []
+        with self._lock:
+            for folder, (previous, since) in list(self._pending.items()):
+                current = self.snapshot(folder)
+                if current is None:
+                    del self._pending[folder]
+                elif current != previous:
+                    self._pending[folder] = (current, now)
+                elif now - since >= self.stable_seconds:
+                    del self._pending[folder]
+                    if current:
+                        ready.append(folder)
+        return sorted(ready)
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+"""
+Pre-upload image optimization for Panel 3 pictures.
+PNGs are recompressed losslessly; oversized photos are downscaled and re-encoded.
+Copies are cached by content hash, originals are never modified.
+"""
+
+import hashlib
+import io
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+PNG_SUFFIXES = {".png"}
+JPEG_SUFFIXES = {".jpg", ".jpeg"}
+
+
+class UploadOptimizer:
+
+    def __init__(self, cache_dir=".cache/uploads", max_side=2048, quality=85, max_kb=500, enabled=True):
+        self.cache_dir = Path(cache_dir)
+        self.max_side = max_side
+        self.quality = quality
+        self.max_kb = max_kb
+        self.enabled = enabled
+        self.original_bytes = 0
+        self.upload_bytes = 0
+
+    @property
+    def saved_bytes(self):
+        return self.original_bytes - self.upload_bytes
+
+    def record(self, original_size, upload_size):
+        """Add one successfully uploaded picture to the totals."""
+        self.original_bytes += original_size
+        self.upload_bytes += upload_size
+
+    def _cache_path(self, data, name):
+        settings = f"{self.max_side}|{self.quality}|{self.max_kb}".encode()
+        digest = hashlib.sha256(data + settings).hexdigest()[:16]
+        return self.cache_dir / digest / name
+
+    def _recompress_png(self, image):
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+        return buffer.getvalue()
+
+    def _reencode_jpeg(self, image, data):
+        oversized = max(image.size) > self.max_side or len(data) > self.max_kb * 1024
+        if not oversized:
+            return None
+        image = ImageOps.exif_transpose(image)
+        if max(image.size) > self.max_side:
+            image.thumbnail((self.max_side, self.max_side), Image.LANCZOS)
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        buffer = io.BytesIO()
+        image.save(
+            buffer, format="JPEG", quality=self.quality, optimize=True, progressive=True,
+            exif=image.info.get("exif", b""),
+        )
+        return buffer.getvalue()
+
+    def prepare(self, path):
+        """Return (upload_path, original_size, upload_size) for an image file."""
+        path = Path(path)
+        data = path.read_bytes()
+        original_size = len(data)
+        suffix = path.suffix.lower()
+
+        upload_path, upload_size = path, original_size
+        if self.enabled and suffix in PNG_SUFFIXES | JPEG_SUFFIXES:
+            target = self._cache_path(data, path.name)
+            if not target.exists():
+                try:
+                    with Image.open(io.BytesIO(data)) as image:
+                        if suffix in PNG_SUFFIXES:
+                            optimized = self._recompress_png(image)
+                        else:
+                            optimized = self._reencode_jpeg(image, data)
+                except (OSError, ValueError):
+                    optimized = None
+                target.parent.mkdir(parents=True, exist_ok=True)
+                if optimized and len(optimized) < original_size:
+                    target.write_bytes(optimized)
+                else:
+                    target.write_bytes(data)
+            upload_path = target
+            upload_size = target.stat().st_size
+
+        return upload_path, original_size, upload_size